@@ -0,0 +1,164 @@
+import os
+from array import array
+
+
+class ChangeSet(object):
+    """
+    Path-interned, array-backed representation of a set of changed paths
+
+    Each distinct path segment is stored once in `names` and referred to
+    by its index. Directories spanned by the changed paths form a tree
+    kept in parallel arrays indexed by node id (`parent`, `name`, `depth`,
+    `dir_change`). Node 0 is the repository root and a parent always has
+    a lower id than its children, so a single forward pass over the arrays
+    visits every directory before its contents.
+
+    Changes are indexed in input order. `dir` holds the directory node a
+    change is grouped under (a changed directory is grouped under itself).
+
+    Usage:
+     cs = ChangeSet(SVNChangeItem(line) for line in svnlook_output)
+     cs.group_by_dir()  # {dir_node: [change, ...], ...}
+     cs.common_base()  # change containing all other changes, or -1
+     cs.path(node)  # "flame2/production/" (built on demand)
+    """
+    def __init__(self, change_items, delim="/"):
+        self.delim = delim
+        self.names = []
+        self.items = []  # change items, in input order
+
+        self.parent = array("i", [-1])
+        self.name = array("i", [-1])
+        self.depth = array("i", [0])
+        self.dir_change = array("i", [-1])  # change index, -1 if unchanged
+
+        self.dir = array("i")
+        self._groups = None
+
+        # lookup tables are only needed while building
+        name_ids = {}
+        dir_ids = {"": 0}
+
+        def name_id(s):
+            i = name_ids.get(s)
+            if i is None:
+                i = name_ids[s] = len(self.names)
+                self.names.append(s)
+            return i
+
+        def dir_node(path):
+            node = dir_ids.get(path)
+            if node is None:
+                head, _, tail = path.rpartition(delim)
+                parent = dir_node(head)
+                node = dir_ids[path] = len(self.parent)
+                self.parent.append(parent)
+                self.name.append(name_id(tail))
+                self.depth.append(self.depth[parent] + 1)
+                self.dir_change.append(-1)
+            return node
+
+        for item in change_items:
+            path = item.path
+            if path.endswith(delim):
+                node = dir_node(path[:-1])
+                self.dir_change[node] = len(self.items)
+            else:
+                node = dir_node(path.rpartition(delim)[0])
+            self.dir.append(node)
+            self.items.append(item)
+
+    def __len__(self):
+        return len(self.items)
+
+    def path(self, node):
+        "Returns path string of directory node, with a trailing delimiter"
+        segments = []
+        while node > 0:
+            segments.append(self.names[self.name[node]])
+            node = self.parent[node]
+        segments.reverse()
+        return "".join(s + self.delim for s in segments)
+
+    def group_by_dir(self):
+        """
+        Returns a dict mapping directory nodes to the list of changes
+        directly within them. A changed directory is grouped under itself,
+        in line with os.path.dirname() on a path with a trailing "/".
+        """
+        if self._groups is None:
+            groups = {}
+            for c, node in enumerate(self.dir):
+                groups.setdefault(node, []).append(c)
+            self._groups = groups
+        return self._groups
+
+    def common_base(self):
+        """
+        Returns the index of the change whose path all other changed paths
+        fall under (or the only change), or -1 if there is none. This is
+        the change found by looking up os.path.commonprefix() of all paths,
+        except that paths are compared by segment: "a/b.txt" is not taken
+        to contain "a/b.txt.orig".
+        """
+        if len(self.items) < 2:
+            return len(self.items) - 1
+
+        # a file has no descendants, so with more than one change the
+        # common base can be found from the directories alone
+        parent, depth = self.parent, self.depth
+        nodes = iter(self.group_by_dir())
+        a = next(nodes)
+        for b in nodes:
+            if a == 0:
+                break
+            while depth[a] > depth[b]:
+                a = parent[a]
+            while depth[b] > depth[a]:
+                b = parent[b]
+            while a != b:
+                a, b = parent[a], parent[b]
+        if a == 0:
+            return -1  # "/" is not a prefix of other paths
+        return self.dir_change[a]
+
+    def match_prefixes(self, prefix_match):
+        """
+        Returns an array mapping each directory node to the node of the
+        path in prefix_match (a PathPrefixMatch) that it falls under, or -1
+        if there is none. Gives the same result as prefix_match.match() on
+        the path of each node without constructing any path strings.
+        """
+        end = prefix_match.delim
+        names, name, parent = self.names, self.name, self.parent
+        trie = [prefix_match.root]  # deepest trie node reached, per node
+        reached = array("i", [0])  # node at which that trie node was reached
+        for n in xrange(1, len(parent)):
+            p = parent[n]
+            t = trie[p]
+            s = names[name[n]]
+            if reached[p] == p and s in t:
+                trie.append(t[s])
+                reached.append(n)
+            else:
+                trie.append(t)
+                reached.append(reached[p])
+        return array("i", [(-1, reached[n])[end in trie[n]]
+                            for n in xrange(len(parent))])
+
+    def glob_match(self, changes, regexes, prefix_len=0):
+        """
+        Returns True if the name of any of the changes, less the first
+        prefix_len characters, matches any of the compiled patterns (see
+        utils.compile_globs). Names are built as the path joined with "."
+        for property changes (so they can be detected by pattern matches)
+        or with "" otherwise, which gives a file a trailing delimiter.
+        """
+        for c in changes:
+            item = self.items[c]
+            fname = os.path.join(item.path, ("", ".")[item.prop_changed])
+            for rx in regexes:
+                if rx.match(fname, prefix_len):
+                    return True
+        return False
+
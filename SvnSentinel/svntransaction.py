@@ -16,6 +16,7 @@ import os
 import sys
 import subprocess
 from operator import attrgetter
+from SvnSentinel.changeset import ChangeSet
 
 
 class SVNTransaction(object):
@@ -24,6 +25,7 @@ class SVNTransaction(object):
         self.svnlook_cmd = svnlook_cmd
         self.repos = repos
         self.txn = txn
+        self._merge_op = False  # not yet computed (None is a valid result)
         self._load_changes()
         self._load_info()
         #print self._svnlook("propget", "svn:mergeinfo flame2/production")
@@ -35,8 +37,8 @@ class SVNTransaction(object):
         Note that the transaction must do only a copy, and not be combined
         with other operations.
         """
-        if len(self.changes) == 1:
-            item = self.changes.values()[0]
+        if len(self.changeset) == 1:
+            item = self.changeset.items[0]
             if item.copied:
                 return (item.source, item.path)
 
@@ -49,8 +51,8 @@ class SVNTransaction(object):
         Note that the transaction must do only a move, and not be combined
         with other operations.
         """
-        if len(self.changes) == 2:
-            s, d = sorted(self.changes.values(), key=attrgetter("copied"))
+        if len(self.changeset) == 2:
+            s, d = sorted(self.changeset.items, key=attrgetter("copied"))
             if d.copied and s.deleted and s.path == d.source:
                 return (s.path, d.path)
 
@@ -66,12 +68,21 @@ class SVNTransaction(object):
 
         Assumes all clients have mergeinfo capabilities (should be checked
         by start-commit hook)
+
+        The result is cached since it requires calls to svnlook and the
+        transaction may be checked against more than one configuration.
         """
-        base = os.path.commonprefix(self.changes.keys())
+        if self._merge_op is False:
+            self._merge_op = self._detect_merge_operation()
+        return self._merge_op
+
+    def _detect_merge_operation(self):
+        base = self.changeset.common_base()
 
         # check if property has changed in base dir
-        if base not in self.changes or not self.changes[base].prop_changed:
+        if base < 0 or not self.changeset.items[base].prop_changed:
             return None  # definitely not a merge
+        base = self.changeset.items[base].path
 
         # check if the mergeinfo property has changed.
         prev_rev = ""
@@ -120,7 +131,15 @@ class SVNTransaction(object):
     def _load_changes(self):
         change_items = (SVNChangeItem(line.strip())
                             for line in re.split("\n(?=\w)", self._svnlook()))
-        self.changes = dict((c.path, c) for c in change_items)
+        self.changeset = ChangeSet(change_items)
+        self._changes = None
+
+    @property
+    def changes(self):
+        "Dict of changed path to SVNChangeItem, built on first use"
+        if self._changes is None:
+            self._changes = dict((c.path, c) for c in self.changeset.items)
+        return self._changes
 
     def _load_info(self):
         self.author, self.date, _, self.log = \
@@ -134,6 +153,9 @@ class SVNTransaction(object):
 
 
 class SVNChangeItem(object):
+    __slots__ = ("status", "added", "deleted", "updated", "prop_changed",
+                 "copied", "path", "source", "rev")
+
     def __init__(self, change_line):
         assert change_line[0] in "ADU_"
         assert change_line[1] in "U "
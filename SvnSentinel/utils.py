@@ -1,4 +1,6 @@
 import os
+import re
+import sys
 import imp
 import fnmatch
 import itertools
@@ -86,9 +88,14 @@ def get_dict_of_lists(path_pairs, inverse=False):
     return d
 
 
-def get_config(cfg_file):
+def get_config(cfg_file, mod_name="cfg_mod"):
+    """
+    Loads cfg_file as module mod_name and returns the processed config.
+    imp.load_source() reuses an already loaded module of the same name, so
+    each config file loaded by a process needs its own mod_name.
+    """
     try:
-        cfg_mod = imp.load_source("cfg_mod", cfg_file)
+        cfg_mod = imp.load_source(mod_name, cfg_file)
         cfg = cfg_mod.precommit_config
     except IOError:
         sys.exit("Could not load config file: %s" % cfg_file)
@@ -110,6 +117,8 @@ def get_config(cfg_file):
     # This list is seached once for each modified file, so we need to
     # do this efficiently. A trie-based search is used. No wildcards allowed
     c["NO_COMMIT_PATHS"] = PathPrefixMatch(c["COMMIT_EXCEPTION_PATHS"].keys())
+    c["COMMIT_EXCEPTION_REGEX"] = dict((k, compile_globs(v))
+                            for k, v in c["COMMIT_EXCEPTION_PATHS"].items())
 
     c["VALID_BRANCH_PATHS"] = get_dict_of_lists(BRANCHING_PATHS)
     c["VALID_BRANCH_SRCS"] = c["VALID_BRANCH_PATHS"].keys()
@@ -141,6 +150,17 @@ def glob_filter(filenames, patterns, prefix_len=0):
     return list(set(itertools.chain(*matched)))  # return flattened list
 
 
+def compile_globs(patterns):
+    """
+    Returns a list of compiled regexes for a list of shell-style patterns,
+    or None if patterns is None. Compiled patterns can be matched from an
+    offset (regex.match(path, prefix_len)) without slicing the path.
+    """
+    if patterns is None:
+        return None
+    return [re.compile(fnmatch.translate(p)) for p in patterns]
+
+
 def get_matched_patterns(file, patterns):
     return [p for p in patterns if fnmatch.fnmatch(file, p)]
 
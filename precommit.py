@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 import os
 import sys
+import time
 import itertools
 from SvnSentinel.svntransaction import SVNTransaction
 from SvnSentinel.utils import *
@@ -9,21 +10,21 @@ from SvnSentinel.exceptions import AllowedOperationException
 
 
 def check_restricted_paths(svn_txn, cfg):
-    c = {}
-    for f, txn in svn_txn.changes.iteritems():
-        # append "/." for directories with property changes so they 
-        # can be detected by pattern matches
-        fname = os.path.join(f, ("", ".")[txn.prop_changed])
-        c.setdefault(os.path.dirname(f) + "/", []).append(fname)
-
-    blist = cfg["COMMIT_EXCEPTION_PATHS"]
-    taboo_paths = cfg["NO_COMMIT_PATHS"]
-    for base in c:
-        d = taboo_paths.match(base)
-        D = str(d) + "/"  # same thing, but with trailing "/"
-        if d and (not blist[D] or not glob_filter(c[base], blist[D], len(D))):
+    cs = svn_txn.changeset
+    roots = cs.match_prefixes(cfg["NO_COMMIT_PATHS"])
+    blist = cfg["COMMIT_EXCEPTION_REGEX"]
+    root_paths = {}
+    for base, changes in cs.group_by_dir().iteritems():
+        r = roots[base]
+        if r < 0:
+            continue
+        if r not in root_paths:
+            root_paths[r] = cs.path(r)  # with trailing "/"
+        D = root_paths[r]
+        if not blist[D] or not cs.glob_match(changes, blist[D], len(D)):
             raise RestrictedOperationException( \
-                    "Direct commits to %s is not allowed" % D, base, cfg)
+                    "Direct commits to %s is not allowed" % D,
+                    cs.path(base), cfg)
 
 
 def check_valid_pairs(op, src_list, dst_map, cfg):
@@ -61,14 +62,14 @@ def check_valid_merge(svn_txn, cfg):
         raise AllowedOperationException
 
 
-def run_checks(cfg, repos, txn, is_revision=False):
+def evaluate_checks(svn_txn, cfg):
     """
-    Returns an error string if an invalid function found, else returns None.
-    With the return value passed into sys.exit(), a None value translates
-    into a successful exit (0) while a string value results in an errorneous
-    exit (1) with the string itself written to stderr.
+    Returns a tuple of (error_string, reason) if svn_txn violates the policy
+    in cfg, where reason is the message of the rejecting exception.
+    Returns (None, None) otherwise. The transaction is only inspected, so
+    the same SVNTransaction can be evaluated against several configurations.
     """
-    t = SVNTransaction(repos, txn, is_revision)
+    t = svn_txn
     c = cfg
 
     ## Add mechanism to bypass checks
@@ -76,10 +77,10 @@ def run_checks(cfg, repos, txn, is_revision=False):
     bypass_users = c["BYPASS_ALLOWED_USERS"]
     if bypass_msg and t.log.startswith(bypass_msg):
         if bypass_users is None:  # No user restriction
-            return None
+            return (None, None)
         assert type(bypass_users) in (list, tuple)
         if t.author in bypass_users:
-            return None
+            return (None, None)
 
     try:
         # check for white-listed actions
@@ -91,13 +92,78 @@ def run_checks(cfg, repos, txn, is_revision=False):
         check_restricted_paths(t, c)
 
     except AllowedOperationException:
-        return None
+        return (None, None)
 
     except RestrictedOperationException, e:
-        return "%s%s" % (c["REJECT_BANNER"], e.get_message())
+        return ("%s%s" % (c["REJECT_BANNER"], e.get_message()), e.message)
 
     else:
-        return None
+        return (None, None)
+
+
+def _verdict_summary(reason):
+    return ("REJECT(%s)" % reason, "ACCEPT")[reason is None]
+
+
+def _append_log(log_file, fields):
+    line = "\t".join([time.strftime("%Y-%m-%d %H:%M:%S")] + list(fields))
+    try:
+        f = open(log_file, "a")
+        try:
+            f.write(line + "\n")
+        finally:
+            f.close()
+    except IOError:
+        pass  # an unwritable shadow log must not block the commit
+
+
+def log_divergence(log_file, svn_txn, summary, shadow_summary):
+    """
+    Appends a one-line record of a verdict mismatch between the active
+    and the shadow configurations to log_file.
+    """
+    _append_log(log_file, (svn_txn.txn, svn_txn.author,
+                            summary, shadow_summary))
+
+
+def log_shadow_error(log_file, txn, exc):
+    """
+    Appends a one-line record of a shadow configuration that failed to
+    load or to evaluate to log_file.
+    """
+    _append_log(log_file, (txn, "-", "ERROR",
+                            "%s: %s" % (exc.__class__.__name__, exc)))
+
+
+def run_checks(cfg, repos, txn, is_revision=False,
+                                    shadow_cfg=None, shadow_log=None):
+    """
+    Returns an error string if an invalid function found, else returns None.
+    With the return value passed into sys.exit(), a None value translates
+    into a successful exit (0) while a string value results in an errorneous
+    exit (1) with the string itself written to stderr.
+
+    If shadow_cfg is given, the same transaction is also evaluated against
+    it and any difference in verdict (including a different reason for
+    rejection) is appended to shadow_log, as are errors raised by the
+    shadow configuration. The shadow verdict never affects the return value.
+    """
+    t = SVNTransaction(repos, txn, is_revision)
+    verdict, reason = evaluate_checks(t, cfg)
+
+    if shadow_cfg is not None:
+        try:
+            shadow_reason = evaluate_checks(t, shadow_cfg)[1]
+            summary = _verdict_summary(reason)
+            shadow_summary = _verdict_summary(shadow_reason)
+            if summary != shadow_summary and shadow_log:
+                log_divergence(shadow_log, t, summary, shadow_summary)
+        except (Exception, SystemExit), e:
+            # a broken candidate policy must not block the commit
+            if shadow_log:
+                log_shadow_error(shadow_log, txn, e)
+
+    return verdict
 
 
 def main():
@@ -115,6 +181,19 @@ Run pre-commit checks on a repository transaction."""
                     metavar="FILE",
                     default=os.path.join(os.getcwd(), "precommit_config.py"),
                     )
+    parser.add_option("-s", "--shadow-cfg",
+                    help="Candidate configuration to evaluate alongside "
+                         "the active one. Its verdict is only logged.",
+                    dest="shadow_cfg_file",
+                    metavar="FILE",
+                    default=None,
+                    )
+    parser.add_option("-l", "--shadow-log",
+                    help="File to append shadow verdict mismatches to",
+                    dest="shadow_log",
+                    metavar="FILE",
+                    default=os.path.join(os.getcwd(), "shadow.log"),
+                    )
 
     try:
         (opts, (repos, txn)) = parser.parse_args()
@@ -122,7 +201,17 @@ Run pre-commit checks on a repository transaction."""
         return parser.print_help()
 
     cfg = get_config(opts.cfg_file)
-    return run_checks(cfg, repos, txn, opts.revision)
+
+    shadow_cfg = None
+    if opts.shadow_cfg_file:
+        try:
+            shadow_cfg = get_config(opts.shadow_cfg_file, "shadow_cfg_mod")
+        except (Exception, SystemExit), e:
+            # a broken candidate policy must not block the commit
+            log_shadow_error(opts.shadow_log, txn, e)
+
+    return run_checks(cfg, repos, txn, opts.revision,
+                        shadow_cfg, opts.shadow_log)
 
 if __name__ == "__main__":
     import sys
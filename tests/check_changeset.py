@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+#
+# Compares SvnSentinel.changeset.ChangeSet against the string-based checks
+# it replaces in precommit.py and svntransaction.py. Exits with an
+# AssertionError on any mismatch.
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from SvnSentinel.changeset import ChangeSet
+from SvnSentinel.utils import PathPrefixMatch, compile_globs, glob_filter
+from SvnSentinel.svntransaction import SVNChangeItem
+
+
+def baseline_names(items):
+    return [os.path.join(i.path, ("", ".")[i.prop_changed])
+                for i in items]
+
+
+def baseline_base(changed):
+    paths = [l.split(None, 1)[1] for l in changed]
+    prefix = os.path.commonprefix(paths)
+    return (None, prefix)[prefix in paths]
+
+
+def base(changed):
+    cs = ChangeSet(SVNChangeItem(l) for l in changed)
+    c = cs.common_base()
+    if c < 0:
+        return None
+    return cs.items[c].path
+
+
+lines = (
+    "A   docs/readme.txt",
+    "_U  docs/",
+    "UU  docs/conf.py",
+    "A   docs/api/",
+    "U   docs/api/index.txt",
+    "D   production/old.c",
+    "A   branches/feature/f1/src/new.c",
+    "_U  branches/feature/f1/",
+    "A   top.txt",
+)
+items = [SVNChangeItem(l) for l in lines]
+
+# group_by_dir
+cs = ChangeSet(items)
+expected = {}
+for i in items:
+    expected.setdefault(os.path.dirname(i.path) + "/", []).append(i.path)
+got = dict((("/", cs.path(d))[d > 0], [cs.items[c].path for c in g])
+                for d, g in cs.group_by_dir().items())
+assert got == expected
+
+# common_base
+for changed in (lines,
+                lines[1:5],
+                lines[:1],
+                lines[6:8],
+                ("_U  production/", "U   production/src/a.c"),
+                ("_U  production/", "U   development/a.c"),
+                ("_U  /", "U   top.txt"),
+                ("U   a.c", "U   b.c"),
+                ()):
+    assert base(changed) == baseline_base(changed), changed
+
+# match_prefixes, including "a/b/x/" under "a/" and "a/b/c/" where the
+# deepest trie node reached ("a/b") is not an end node
+p = PathPrefixMatch(["docs/", "branches/", "a/", "a/b/c/"])
+cs = ChangeSet(SVNChangeItem("A   %s" % l) for l in (
+                "a/b/x/y.c", "a/b/c/d/e.c", "a/z.c", "a/b/y.c",
+                "docs/api/x.txt", "production/x.c", "top.txt"))
+roots = cs.match_prefixes(p)
+for n in xrange(len(cs.parent)):
+    m = p.match(("/", cs.path(n))[n > 0])
+    assert (m is None and roots[n] < 0) or \
+            (roots[n] >= 0 and m + "/" == cs.path(roots[n])), cs.path(n)
+assert roots[cs.dir[0]] < 0  # a/b/x/
+
+# glob_match: file, directory with property changes and file with
+# property changes
+cs = ChangeSet(items)
+groups = cs.group_by_dir()
+for patterns in (("*.txt",), ("*.txt/",), ("*",), ("api/.",),
+                    (".",), ("conf.py/.",), ("conf.py",), ("*/*",)):
+    regexes = compile_globs(patterns)
+    for d, g in groups.items():
+        if d == 0:
+            continue
+        prefix = cs.path(cs.parent[d])
+        names = baseline_names(cs.items[c] for c in g)
+        assert cs.glob_match(g, regexes, len(prefix)) == \
+                bool(glob_filter(names, patterns, len(prefix))), \
+                (patterns, cs.path(d))
+docs = groups[cs.dir[0]]
+assert not cs.glob_match(docs[:1], compile_globs(("*.txt",)), 5)
+assert cs.glob_match(docs[:1], compile_globs(("*.txt/",)), 5)
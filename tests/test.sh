@@ -40,18 +40,21 @@ TESTS=(
 TEST_FAILED=0
 TEST_COUNT=0
 
-function run_test {
-    REV=$1; shift
+# Shadow (candidate) policy runs. The shadow verdict must not change the
+# exit code, but mismatches and errors must be appended to the shadow log.
+SHADOW_LOG="shadow_test.log"
+SHADOW_TESTS=(
+  # "rev_id expected_rc expected_log_lines shadow_cfg test_label..."
+    "5  1 1 ${BASEDIR}/../precommit_config.py Shadow accepts, active rejects"
+    "2  0 0 ${CFG} Shadow agrees with active policy"
+    "5  1 1 ${BASEDIR}/missing_config.py Shadow config fails to load"
+)
+
+function report {
+    RET=$1; shift
     EXPECT=$1; shift
     LABEL=$*
-    CMD="${RUN} ${REV}"
-    (( TEST_COUNT++ ))
 
-    echo "#${TEST_COUNT}" >> $LOG
-    echo "Running $CMD" >> $LOG
-    OUT=$($CMD 2>&1)
-    RET=$?
-    
     echo " - expecting rc ${EXPECT}, got ${RET}" >> $LOG
     if [[ $OUT != "" ]]; then
         echo " - STDERR:" >> $LOG
@@ -65,7 +68,63 @@ function run_test {
     else
         echo -e "\e[01;32mPASS\e[00m"
     fi
-    
+}
+
+function run_test {
+    REV=$1; shift
+    EXPECT=$1; shift
+    LABEL=$*
+    CMD="${RUN} ${REV}"
+    (( TEST_COUNT++ ))
+
+    echo "#${TEST_COUNT}" >> $LOG
+    echo "Running $CMD" >> $LOG
+    OUT=$($CMD 2>&1)
+    report $? $EXPECT $LABEL
+}
+
+# Checks that run without a repository
+UNIT_TESTS=(
+    "SvnSentinel/utils.py"
+    "tests/check_changeset.py"
+)
+
+function run_unit_test {
+    CMD="python $*"
+    (( TEST_COUNT++ ))
+
+    echo "#${TEST_COUNT}" >> $LOG
+    echo "Running $CMD" >> $LOG
+    OUT=$(cd ${BASEDIR}/.. && $CMD 2>&1)
+    report $? 0 Self-check: $*
+}
+
+function run_shadow_test {
+    REV=$1; shift
+    EXPECT=$1; shift
+    EXPECT_LINES=$1; shift
+    SHADOW_CFG=$1; shift
+    LABEL=$*
+    CMD="${RUN} ${REV} -s ${SHADOW_CFG} -l ${SHADOW_LOG}"
+    (( TEST_COUNT++ ))
+
+    rm -f $SHADOW_LOG
+    echo "#${TEST_COUNT}" >> $LOG
+    echo "Running $CMD" >> $LOG
+    OUT=$($CMD 2>&1)
+    RET=$?
+    LINES=0
+    if [[ -f $SHADOW_LOG ]]; then
+        LINES=$(wc -l < $SHADOW_LOG)
+        echo " - SHADOW LOG:" >> $LOG
+        cat $SHADOW_LOG >> $LOG
+        rm -f $SHADOW_LOG
+    fi
+    echo " - expecting ${EXPECT_LINES} shadow log lines, got ${LINES}" >> $LOG
+    if [[ $LINES -ne $EXPECT_LINES ]]; then
+        RET="-1"  # force a failure
+    fi
+    report $RET $EXPECT $LABEL
 }
 
 echo "TESTING SVNSENTINEL"
@@ -73,10 +132,18 @@ echo "==================="
 echo "REPO: ${REPO}"
 echo
 
+for i in "${UNIT_TESTS[@]}"; do
+    run_unit_test $i
+done
+
 for i in "${TESTS[@]}"; do
     run_test $i
 done
 
+for i in "${SHADOW_TESTS[@]}"; do
+    run_shadow_test $i
+done
+
 echo ""
 echo "------------------------------------------"
 echo -n "     ${TEST_COUNT} tests. "